@@ -0,0 +1,33 @@
+"""
+Shared fixtures for the Mergington High School Activities API tests
+"""
+import pytest
+from fastapi.testclient import TestClient
+from src.app import app
+
+
+@pytest.fixture(scope="session")
+def client():
+    """Create a single test client for the FastAPI app, shared by all tests"""
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture(scope="session")
+def anyio_backend():
+    """Run async tests on asyncio only"""
+    return "asyncio"
+
+
+@pytest.fixture(scope="session")
+def prebuilt_request(client):
+    """Build a request on the shared client once and reuse it for identical calls"""
+    cache = {}
+
+    def build(method, url, email):
+        key = (method, url, email)
+        if key not in cache:
+            cache[key] = client.build_request(method, url, params={"email": email})
+        return cache[key]
+
+    return build
@@ -1,41 +1,80 @@
 """
 Tests for the Mergington High School Activities API
 """
+import asyncio
+import copy
+import json
+
 import pytest
-from fastapi.testclient import TestClient
+from httpx import ASGITransport, AsyncClient
 from src.app import app, activities
 
 
-@pytest.fixture
-def client():
-    """Create a test client for the FastAPI app"""
-    return TestClient(app)
+# Initial state, restored only by the reset_activities fixture for tests that request it
+_INITIAL_ACTIVITIES = {
+    "Basketball Team": {
+        "description": "Join the school basketball team and compete in inter-school tournaments",
+        "schedule": "Mondays and Wednesdays, 4:00 PM - 6:00 PM",
+        "max_participants": 15,
+        "participants": ["james@mergington.edu", "william@mergington.edu"]
+    },
+    "Swimming Club": {
+        "description": "Improve swimming techniques and participate in swimming competitions",
+        "schedule": "Tuesdays and Thursdays, 4:00 PM - 5:30 PM",
+        "max_participants": 20,
+        "participants": ["ava@mergington.edu", "noah@mergington.edu"]
+    },
+    "Drama Club": {
+        "description": "Perform in school plays and develop acting skills",
+        "schedule": "Wednesdays, 3:30 PM - 5:30 PM",
+        "max_participants": 25,
+        "participants": ["isabella@mergington.edu", "liam@mergington.edu"]
+    }
+}
+
+
+# Request targets and emails shared across tests
+BASKETBALL = "Basketball Team"
+SWIMMING = "Swimming Club"
+DRAMA = "Drama Club"
+NONEXISTENT = "Nonexistent Activity"
+SIGNUP_URL = "/activities/{}/signup"
+UNREGISTER_URL = "/activities/{}/unregister"
+BASKETBALL_SIGNUP_URL = SIGNUP_URL.format(BASKETBALL)
+BASKETBALL_UNREGISTER_URL = UNREGISTER_URL.format(BASKETBALL)
+REGISTERED_EMAIL = "james@mergington.edu"
+NEW_EMAIL = "new.student@mergington.edu"
+UNKNOWN_EMAIL = "test@mergington.edu"
+
+# Calls repeated across tests, sent as requests prebuilt on the shared client
+SIGNUP_CALL = ("POST", BASKETBALL_SIGNUP_URL, NEW_EMAIL)
+UNREGISTER_CALL = ("DELETE", BASKETBALL_UNREGISTER_URL, REGISTERED_EMAIL)
+
+# Base URL for AsyncClient, matching TestClient's default
+BASE_URL = "http://testserver"
+
+
+def _json_bytes(body):
+    """Encode a body the same way FastAPI's JSONResponse renders it"""
+    return json.dumps(body, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+EXPECTED_SIGNUP_BODY = _json_bytes({"message": f"Signed up {NEW_EMAIL} for {BASKETBALL}"})
+EXPECTED_UNREGISTER_BODY = _json_bytes(
+    {"message": f"Unregistered {REGISTERED_EMAIL} from {BASKETBALL}"}
+)
+
+
+def assert_body(response, expected):
+    """Assert the raw response body matches the expected bytes exactly"""
+    assert response.content == expected, response.text
 
 
-@pytest.fixture(autouse=True)
+@pytest.fixture
 def reset_activities():
-    """Reset activities to initial state before each test"""
+    """Reset activities to initial state for tests that depend on it"""
     activities.clear()
-    activities.update({
-        "Basketball Team": {
-            "description": "Join the school basketball team and compete in inter-school tournaments",
-            "schedule": "Mondays and Wednesdays, 4:00 PM - 6:00 PM",
-            "max_participants": 15,
-            "participants": ["james@mergington.edu", "william@mergington.edu"]
-        },
-        "Swimming Club": {
-            "description": "Improve swimming techniques and participate in swimming competitions",
-            "schedule": "Tuesdays and Thursdays, 4:00 PM - 5:30 PM",
-            "max_participants": 20,
-            "participants": ["ava@mergington.edu", "noah@mergington.edu"]
-        },
-        "Drama Club": {
-            "description": "Perform in school plays and develop acting skills",
-            "schedule": "Wednesdays, 3:30 PM - 5:30 PM",
-            "max_participants": 25,
-            "participants": ["isabella@mergington.edu", "liam@mergington.edu"]
-        }
-    })
+    activities.update(copy.deepcopy(_INITIAL_ACTIVITIES))
 
 
 class TestRootEndpoint:
@@ -51,139 +90,86 @@ class TestRootEndpoint:
 class TestGetActivities:
     """Tests for GET /activities endpoint"""
 
-    def test_get_all_activities(self, client):
-        """Test retrieving all activities"""
+    @pytest.mark.parametrize("activity_name", list(_INITIAL_ACTIVITIES))
+    def test_activity_present(self, client, activity_name):
+        """Test that each activity is returned"""
         response = client.get("/activities")
         assert response.status_code == 200
-        data = response.json()
-        assert "Basketball Team" in data
-        assert "Swimming Club" in data
-        assert "Drama Club" in data
+        assert activity_name in response.json()
 
-    def test_activities_structure(self, client):
-        """Test that activities have the correct structure"""
+    def test_activities_structure_and_participants(self, client, reset_activities):
+        """Test that activities have the correct structure and participants"""
         response = client.get("/activities")
-        data = response.json()
+        basketball = response.json()[BASKETBALL]
         
-        basketball = data["Basketball Team"]
         assert "description" in basketball
         assert "schedule" in basketball
         assert "max_participants" in basketball
         assert "participants" in basketball
         assert isinstance(basketball["participants"], list)
-
-    def test_activities_participants(self, client):
-        """Test that activities return correct participants"""
-        response = client.get("/activities")
-        data = response.json()
-        
-        basketball = data["Basketball Team"]
-        assert "james@mergington.edu" in basketball["participants"]
+        assert REGISTERED_EMAIL in basketball["participants"]
         assert "william@mergington.edu" in basketball["participants"]
 
 
+@pytest.mark.usefixtures("reset_activities")
 class TestSignupForActivity:
     """Tests for POST /activities/{activity_name}/signup endpoint"""
 
-    def test_signup_new_participant(self, client):
+    def test_signup_new_participant(self, client, prebuilt_request):
         """Test signing up a new participant"""
-        response = client.post(
-            "/activities/Basketball Team/signup?email=new.student@mergington.edu"
-        )
+        response = client.send(prebuilt_request(*SIGNUP_CALL))
         assert response.status_code == 200
-        data = response.json()
-        assert "Signed up new.student@mergington.edu for Basketball Team" in data["message"]
+        assert_body(response, EXPECTED_SIGNUP_BODY)
 
     def test_signup_adds_participant_to_list(self, client):
         """Test that signup actually adds participant to the activity"""
         email = "test.student@mergington.edu"
-        client.post(f"/activities/Basketball Team/signup?email={email}")
+        client.post(BASKETBALL_SIGNUP_URL, params={"email": email})
         
-        response = client.get("/activities")
-        data = response.json()
-        assert email in data["Basketball Team"]["participants"]
+        assert email in activities[BASKETBALL]["participants"]
 
-    def test_signup_duplicate_participant(self, client):
-        """Test that signing up the same participant twice fails"""
-        email = "james@mergington.edu"
-        response = client.post(f"/activities/Basketball Team/signup?email={email}")
-        assert response.status_code == 400
-        data = response.json()
-        assert "already signed up" in data["detail"].lower()
-
-    def test_signup_nonexistent_activity(self, client):
-        """Test signing up for a non-existent activity"""
-        response = client.post(
-            "/activities/Nonexistent Activity/signup?email=test@mergington.edu"
-        )
-        assert response.status_code == 404
-        data = response.json()
-        assert "not found" in data["detail"].lower()
-
-    def test_signup_multiple_participants(self, client):
-        """Test signing up multiple new participants"""
+    @pytest.mark.anyio
+    async def test_signup_multiple_participants(self):
+        """Test signing up multiple new participants concurrently"""
         emails = ["student1@mergington.edu", "student2@mergington.edu", "student3@mergington.edu"]
+        url = SIGNUP_URL.format(DRAMA)
         
-        for email in emails:
-            response = client.post(f"/activities/Drama Club/signup?email={email}")
-            assert response.status_code == 200
-        
-        response = client.get("/activities")
-        data = response.json()
-        drama_participants = data["Drama Club"]["participants"]
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url=BASE_URL) as ac:
+            responses = await asyncio.gather(
+                *(ac.post(url, params={"email": email}) for email in emails)
+            )
+            for email, response in zip(emails, responses):
+                assert response.status_code == 200
+                assert response.json()["message"] == f"Signed up {email} for {DRAMA}"
         
-        for email in emails:
-            assert email in drama_participants
+        drama_participants = activities[DRAMA]["participants"]
+        assert sorted(drama_participants[-len(emails):]) == sorted(emails)
 
 
+@pytest.mark.usefixtures("reset_activities")
 class TestUnregisterFromActivity:
     """Tests for DELETE /activities/{activity_name}/unregister endpoint"""
 
-    def test_unregister_existing_participant(self, client):
+    def test_unregister_existing_participant(self, client, prebuilt_request):
         """Test unregistering an existing participant"""
-        email = "james@mergington.edu"
-        response = client.delete(
-            f"/activities/Basketball Team/unregister?email={email}"
-        )
+        response = client.send(prebuilt_request(*UNREGISTER_CALL))
         assert response.status_code == 200
-        data = response.json()
-        assert f"Unregistered {email} from Basketball Team" in data["message"]
+        assert_body(response, EXPECTED_UNREGISTER_BODY)
 
-    def test_unregister_removes_participant_from_list(self, client):
+    def test_unregister_removes_participant_from_list(self, client, prebuilt_request):
         """Test that unregister actually removes participant from the activity"""
-        email = "james@mergington.edu"
-        client.delete(f"/activities/Basketball Team/unregister?email={email}")
+        client.send(prebuilt_request(*UNREGISTER_CALL))
         
-        response = client.get("/activities")
-        data = response.json()
-        assert email not in data["Basketball Team"]["participants"]
-
-    def test_unregister_nonexistent_participant(self, client):
-        """Test unregistering a participant who is not registered"""
-        email = "notregistered@mergington.edu"
-        response = client.delete(
-            f"/activities/Basketball Team/unregister?email={email}"
-        )
-        assert response.status_code == 400
-        data = response.json()
-        assert "not registered" in data["detail"].lower()
-
-    def test_unregister_from_nonexistent_activity(self, client):
-        """Test unregistering from a non-existent activity"""
-        response = client.delete(
-            "/activities/Nonexistent Activity/unregister?email=test@mergington.edu"
-        )
-        assert response.status_code == 404
-        data = response.json()
-        assert "not found" in data["detail"].lower()
+        assert REGISTERED_EMAIL not in activities[BASKETBALL]["participants"]
 
     def test_signup_and_unregister_workflow(self, client):
-        """Test complete workflow: signup and then unregister"""
+        """Test complete workflow over HTTP: signup and then unregister"""
         email = "workflow.test@mergington.edu"
-        activity = "Swimming Club"
+        activity = SWIMMING
         
         # Sign up
-        response = client.post(f"/activities/{activity}/signup?email={email}")
+        response = client.post(SIGNUP_URL.format(activity), params={"email": email})
         assert response.status_code == 200
         
         # Verify participant is in the list
@@ -192,7 +178,7 @@ class TestUnregisterFromActivity:
         assert email in data[activity]["participants"]
         
         # Unregister
-        response = client.delete(f"/activities/{activity}/unregister?email={email}")
+        response = client.delete(UNREGISTER_URL.format(activity), params={"email": email})
         assert response.status_code == 200
         
         # Verify participant is removed
@@ -201,42 +187,56 @@ class TestUnregisterFromActivity:
         assert email not in data[activity]["participants"]
 
 
+@pytest.mark.usefixtures("reset_activities")
+class TestRequestErrors:
+    """Tests for error responses from signup and unregister"""
+
+    @pytest.mark.parametrize(
+        "method,path,email,status,detail_substr",
+        [
+            ("POST", BASKETBALL_SIGNUP_URL, REGISTERED_EMAIL, 400, "already signed up"),
+            ("POST", SIGNUP_URL.format(NONEXISTENT), UNKNOWN_EMAIL, 404, "not found"),
+            ("DELETE", BASKETBALL_UNREGISTER_URL, "notregistered@mergington.edu", 400, "not registered"),
+            ("DELETE", UNREGISTER_URL.format(NONEXISTENT), UNKNOWN_EMAIL, 404, "not found"),
+        ],
+        ids=[
+            "signup-duplicate",
+            "signup-nonexistent-activity",
+            "unregister-not-registered",
+            "unregister-nonexistent-activity",
+        ],
+    )
+    def test_error_response(self, client, method, path, email, status, detail_substr):
+        """Test the status code and detail message for invalid requests"""
+        response = client.request(method, path, params={"email": email})
+        assert response.status_code == status
+        assert detail_substr in response.json()["detail"].lower()
+
+
 class TestActivityCapacity:
     """Tests for activity participant capacity"""
 
-    def test_activity_has_max_participants(self, client):
-        """Test that activities have max_participants defined"""
+    @pytest.mark.parametrize("activity_name", list(_INITIAL_ACTIVITIES))
+    def test_activity_has_max_participants(self, client, activity_name):
+        """Test that each activity has max_participants defined"""
         response = client.get("/activities")
-        data = response.json()
+        activity = response.json()[activity_name]
         
-        for activity in data.values():
-            assert "max_participants" in activity
-            assert activity["max_participants"] > 0
+        assert "max_participants" in activity
+        assert activity["max_participants"] > 0
 
-    def test_participants_count_increases_on_signup(self, client):
+    def test_participants_count_increases_on_signup(self, client, reset_activities, prebuilt_request):
         """Test that participant count increases when signing up"""
-        response = client.get("/activities")
-        initial_data = response.json()
-        initial_count = len(initial_data["Basketball Team"]["participants"])
-        
-        client.post("/activities/Basketball Team/signup?email=new@mergington.edu")
+        initial_count = len(activities[BASKETBALL]["participants"])
         
-        response = client.get("/activities")
-        updated_data = response.json()
-        new_count = len(updated_data["Basketball Team"]["participants"])
+        client.send(prebuilt_request(*SIGNUP_CALL))
         
-        assert new_count == initial_count + 1
+        assert len(activities[BASKETBALL]["participants"]) == initial_count + 1
 
-    def test_participants_count_decreases_on_unregister(self, client):
+    def test_participants_count_decreases_on_unregister(self, client, reset_activities, prebuilt_request):
         """Test that participant count decreases when unregistering"""
-        response = client.get("/activities")
-        initial_data = response.json()
-        initial_count = len(initial_data["Basketball Team"]["participants"])
+        initial_count = len(activities[BASKETBALL]["participants"])
         
-        client.delete("/activities/Basketball Team/unregister?email=james@mergington.edu")
-        
-        response = client.get("/activities")
-        updated_data = response.json()
-        new_count = len(updated_data["Basketball Team"]["participants"])
+        client.send(prebuilt_request(*UNREGISTER_CALL))
         
-        assert new_count == initial_count - 1
+        assert len(activities[BASKETBALL]["participants"]) == initial_count - 1